@@ -2,7 +2,9 @@
 NVIDIA Riva TTS Service - Text-to-Speech synthesis
 """
 import grpc
+import httpx
 import logging
+import wave
 from typing import Optional, Dict, List
 import numpy as np
 import io
@@ -20,6 +22,30 @@ class RivaService:
     def __init__(self):
         self.riva_url = settings.RIVA_API_URL
         self.default_voice = settings.RIVA_VOICE_NAME
+        self.riva_host = self.riva_url.replace('http://', '').replace('https://', '')
+        self._channel: Optional[grpc.aio.Channel] = None
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def _get_channel(self) -> grpc.aio.Channel:
+        """Return the persistent gRPC channel, creating it on first use"""
+        if self._channel is None:
+            self._channel = grpc.aio.insecure_channel(self.riva_host)
+        return self._channel
+    
+    def _get_http(self) -> httpx.AsyncClient:
+        """Return the persistent HTTP client, creating it on first use"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=60.0)
+        return self._http
+    
+    async def aclose(self) -> None:
+        """Close the gRPC channel and HTTP client"""
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
         
     async def synthesize_speech(
         self,
@@ -79,46 +105,42 @@ class RivaService:
         3. Handle streaming responses
         """
         try:
-            # Parse Riva URL
-            riva_host = self.riva_url.replace('http://', '').replace('https://', '')
-            
-            # Create gRPC channel
-            channel = grpc.aio.insecure_channel(riva_host)
+            # Reuse the gRPC channel across calls
+            channel = self._get_channel()
             
             # In production, use actual Riva proto stubs:
             # from riva.client import SpeechSynthesisServiceStub
             # stub = SpeechSynthesisServiceStub(channel)
             
             # For now, we'll simulate with httpx as fallback
-            import httpx
+            client = self._get_http()
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # This endpoint structure is illustrative
-                # Actual Riva deployment may use gRPC or REST
-                response = await client.post(
-                    f"http://{riva_host}/v1/tts/synthesize",
-                    json={
-                        "text": text,
-                        "voice": voice,
-                        "language_code": language_code,
+            # This endpoint structure is illustrative
+            # Actual Riva deployment may use gRPC or REST
+            response = await client.post(
+                f"http://{self.riva_host}/v1/tts/synthesize",
+                json={
+                    "text": text,
+                    "voice": voice,
+                    "language_code": language_code,
+                    "sample_rate_hertz": sample_rate,
+                    "encoding": "LINEAR_PCM",
+                    "audio_config": {
+                        "audio_encoding": "LINEAR_PCM",
                         "sample_rate_hertz": sample_rate,
-                        "encoding": "LINEAR_PCM",
-                        "audio_config": {
-                            "audio_encoding": "LINEAR_PCM",
-                            "sample_rate_hertz": sample_rate,
-                            "pitch": 0.0,
-                            "speaking_rate": 1.0,
-                            "volume_gain_db": 0.0
-                        }
+                        "pitch": 0.0,
+                        "speaking_rate": 1.0,
+                        "volume_gain_db": 0.0
                     }
-                )
+                }
+            )
+            
+            if response.status_code == 200:
+                # Response should contain audio bytes
+                return response.content
+            else:
+                raise Exception(f"Riva TTS failed: {response.status_code} - {response.text}")
                 
-                if response.status_code == 200:
-                    # Response should contain audio bytes
-                    return response.content
-                else:
-                    raise Exception(f"Riva TTS failed: {response.status_code} - {response.text}")
-                    
         except Exception as e:
             logger.error(f"gRPC synthesis error: {str(e)}")
             # Fallback to mock data for development
@@ -152,8 +174,6 @@ class RivaService:
         Returns:
             Complete WAV file as bytes
         """
-        import wave
-        
         # Create WAV file in memory
         wav_buffer = io.BytesIO()
         
@@ -2,18 +2,72 @@
 Video generation service - integrates NVIDIA Riva TTS and video generation
 """
 import asyncio
+import av
+import hashlib
+import io
 import httpx
-from typing import Dict, Optional, List
+from typing import AsyncIterator, BinaryIO, Dict, Optional, List, Tuple
 from google.cloud import storage, pubsub_v1
 import logging
-import json
-import os
-from datetime import datetime
+import orjson
+import random
+import struct
+import tempfile
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
 
 from app.core.config import settings
+from app.services.riva_service import RivaService
 
 logger = logging.getLogger(__name__)
 
+# GCS resumable upload chunk size for videos (must be a multiple of 256KiB)
+VIDEO_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+PLACEHOLDER_THUMBNAIL_URL = "https://via.placeholder.com/640x360/007AFF/FFFFFF?text=Motivational+Clip"
+
+# Per-clip output files and their content types, shared between
+# clips/<clip_id>/ and cache/<key>/
+CLIP_ASSETS = {
+    "audio.wav": "audio/wav",
+    "thumbnail.jpg": "image/jpeg",
+    "video.mp4": "video/mp4"
+}
+
+# D-ID talks awaiting a webhook callback, keyed by talk ID (per process),
+# with the clip ID the webhook was registered for. The webhook only signals
+# that the talk changed state; the result is always re-read from the D-ID
+# API, and a slow poll runs alongside in case the callback is delivered to
+# another replica.
+_pending_did_talks: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+
+def resolve_did_webhook(clip_id: str, data: Dict) -> bool:
+    """
+    Wake up a generation waiting on a D-ID talk
+    
+    Args:
+        clip_id: Clip identifier from the webhook URL
+        data: Talk payload posted by D-ID
+        
+    Returns:
+        True if a waiting generation for this talk was found in this process
+    """
+    talk_id = data.get("id")
+    pending = _pending_did_talks.get(talk_id) if isinstance(talk_id, str) else None
+    if pending is None:
+        return False
+    
+    expected_clip_id, future = pending
+    if clip_id != expected_clip_id:
+        logger.warning(f"D-ID webhook for talk {talk_id} does not match clip {clip_id}")
+        return False
+    
+    if not future.done():
+        future.set_result(None)
+    return True
+
 
 class VideoGenerationService:
     """Service for generating motivational videos with AI"""
@@ -23,7 +77,43 @@ class VideoGenerationService:
         self.video_bucket = self.gcs_client.bucket(settings.GCS_VIDEO_BUCKET)
         self.did_api_key = settings.DID_API_KEY
         self.did_url = settings.DID_API_URL
-        self.publisher = pubsub_v1.PublisherClient()
+        if settings.PUBLIC_API_BASE and not settings.DID_WEBHOOK_SECRET:
+            logger.warning("PUBLIC_API_BASE is set without DID_WEBHOOK_SECRET; D-ID webhooks disabled")
+        self.publisher = pubsub_v1.PublisherClient(
+            batch_settings=pubsub_v1.types.BatchSettings(
+                max_messages=100,
+                max_bytes=1024 * 1024,
+                max_latency=0.05
+            )
+        )
+        self.riva_service = RivaService()
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    async def _get_http(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=300.0,
+                limits=httpx.Limits(
+                    max_keepalive_connections=32,
+                    max_connections=64,
+                    keepalive_expiry=60
+                )
+            )
+        return self._http
+    
+    async def aclose(self) -> None:
+        """Close pooled connections held by the service"""
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+        await self.riva_service.aclose()
+    
+    async def __aenter__(self) -> "VideoGenerationService":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
     
     async def generate_video(
         self, 
@@ -47,38 +137,52 @@ class VideoGenerationService:
         try:
             logger.info(f"Starting video generation for clip {clip_id}")
             
-            # 1. Import Riva service
-            from app.services.riva_service import RivaService
-            riva_service = RivaService()
+            # 0. Reuse a previous render of the same script, voice and presenter
+            cache_key = self._cache_key(script, voice_name, presenter_image)
+            if settings.VIDEO_CACHE_ENABLED:
+                cached = await self._restore_from_cache(cache_key, clip_id)
+                if cached:
+                    return cached
             
-            # 2. Generate audio with Riva TTS
+            # 1-2. Generate audio with Riva TTS
             logger.info(f"Generating audio for clip {clip_id}")
-            audio_data = await riva_service.synthesize_speech(
+            audio_data = await self.riva_service.synthesize_speech(
                 text=script,
                 voice_name=voice_name
             )
             
             # 3. Upload audio to GCS
             audio_url = await self._upload_audio(clip_id, audio_data)
-            logger.info(f"Audio uploaded to {audio_url}")
             
             # 4. Generate video with D-ID
             logger.info(f"Generating video for clip {clip_id}")
-            video_url = await self._generate_video_with_did(
+            video_url, video_file = await self._generate_video_with_did(
                 script=script, 
                 audio_url=audio_url,
                 clip_id=clip_id,
                 presenter_image=presenter_image
             )
             
-            # 5. Generate thumbnail
-            thumbnail_url = await self._generate_thumbnail(clip_id, video_url)
+            # 5. Generate thumbnail from the already-downloaded video
+            try:
+                thumbnail_url = await self._generate_thumbnail(clip_id, video_file)
+            finally:
+                video_file.close()
             
             # 6. Calculate video duration from audio
             duration = await self._calculate_duration(audio_data)
             
             logger.info(f"Video generation completed for clip {clip_id}")
             
+            # 7. Store outputs for identical future requests
+            if settings.VIDEO_CACHE_ENABLED:
+                await self._store_in_cache(
+                    cache_key,
+                    clip_id,
+                    duration=duration,
+                    has_thumbnail=thumbnail_url != PLACEHOLDER_THUMBNAIL_URL
+                )
+            
             return {
                 "clip_id": clip_id,
                 "audio_url": audio_url,
@@ -92,6 +196,148 @@ class VideoGenerationService:
             logger.error(f"Error generating video for clip {clip_id}: {str(e)}", exc_info=True)
             raise
     
+    @staticmethod
+    def _cache_key(
+        script: str,
+        voice_name: Optional[str],
+        presenter_image: Optional[str]
+    ) -> str:
+        """Content address for a rendered clip"""
+        voice = voice_name or settings.RIVA_VOICE_NAME
+        content = f"{voice}|{presenter_image or ''}|{script}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def _copy_blob(
+        self,
+        src_name: str,
+        dst_name: str,
+        content_type: str,
+        metadata: Optional[Dict] = None
+    ) -> storage.Blob:
+        """
+        Server-side copy within the video bucket; no bytes pass through us
+        
+        Destination properties replace the source's on rewrite, so the
+        content type is always set explicitly
+        """
+        src = self.video_bucket.blob(src_name)
+        dst = self.video_bucket.blob(dst_name)
+        dst.content_type = content_type
+        if metadata:
+            dst.metadata = metadata
+        
+        token, _, _ = dst.rewrite(src)
+        while token is not None:
+            token, _, _ = dst.rewrite(src, token=token)
+        return dst
+    
+    async def _restore_from_cache(self, cache_key: str, clip_id: str) -> Optional[Dict]:
+        """
+        Copy cached outputs into the clip's folder
+        
+        Returns:
+            Generation result dict on a cache hit, None otherwise
+        """
+        try:
+            prefix = f"{settings.VIDEO_CACHE_PREFIX}/{cache_key}"
+            cached_video = await asyncio.to_thread(
+                self.video_bucket.get_blob,
+                f"{prefix}/video.mp4"
+            )
+            if cached_video is None:
+                return None
+            
+            metadata = cached_video.metadata or {}
+            assets = [
+                name for name in CLIP_ASSETS
+                if name != "thumbnail.jpg" or metadata.get("has_thumbnail") == "true"
+            ]
+            
+            blobs = await asyncio.gather(*[
+                asyncio.to_thread(
+                    self._copy_blob,
+                    f"{prefix}/{name}",
+                    f"clips/{clip_id}/{name}",
+                    CLIP_ASSETS[name],
+                    {"clip_id": clip_id, "created_at": datetime.utcnow().isoformat()}
+                )
+                for name in assets
+            ])
+            urls = {name: self._blob_url(blob) for name, blob in zip(assets, blobs)}
+            
+            logger.info(f"Restored clip {clip_id} from cache entry {cache_key}")
+            
+            return {
+                "clip_id": clip_id,
+                "audio_url": urls["audio.wav"],
+                "video_url": urls["video.mp4"],
+                "thumbnail_url": urls.get("thumbnail.jpg", PLACEHOLDER_THUMBNAIL_URL),
+                "duration": int(metadata.get("duration", 60)),
+                "status": "completed"
+            }
+            
+        except Exception as e:
+            logger.warning(f"Could not restore clip {clip_id} from cache: {str(e)}")
+            return None
+    
+    async def _store_in_cache(
+        self,
+        cache_key: str,
+        clip_id: str,
+        duration: int,
+        has_thumbnail: bool
+    ) -> None:
+        """
+        Copy a finished clip's outputs under the cache prefix
+        
+        The video is written last so its presence marks a complete entry.
+        Eviction is left to a lifecycle rule on the cache prefix.
+        """
+        try:
+            prefix = f"{settings.VIDEO_CACHE_PREFIX}/{cache_key}"
+            
+            # Audio and thumbnail in parallel, then the video as the marker
+            supporting = ["audio.wav"] + (["thumbnail.jpg"] if has_thumbnail else [])
+            await asyncio.gather(*[
+                asyncio.to_thread(
+                    self._copy_blob,
+                    f"clips/{clip_id}/{name}",
+                    f"{prefix}/{name}",
+                    CLIP_ASSETS[name]
+                )
+                for name in supporting
+            ])
+            
+            await asyncio.to_thread(
+                self._copy_blob,
+                f"clips/{clip_id}/video.mp4",
+                f"{prefix}/video.mp4",
+                CLIP_ASSETS["video.mp4"],
+                {
+                    "duration": str(duration),
+                    "has_thumbnail": "true" if has_thumbnail else "false"
+                }
+            )
+            
+        except Exception as e:
+            logger.warning(f"Could not cache clip {clip_id}: {str(e)}")
+    
+    def _blob_url(self, blob: storage.Blob) -> str:
+        """
+        Build a readable URL for an uploaded blob without a GCS round-trip
+        
+        Public buckets (public-read granted via IAM) use the plain object URL;
+        otherwise a V4 signed URL is generated locally
+        """
+        if settings.GCS_VIDEO_BUCKET_PUBLIC:
+            return blob.public_url
+        
+        return blob.generate_signed_url(
+            version="v4",
+            expiration=timedelta(days=settings.GCS_SIGNED_URL_EXPIRATION_DAYS),
+            method="GET"
+        )
+    
     async def _upload_audio(self, clip_id: str, audio_data: bytes) -> str:
         """Upload audio file to Google Cloud Storage"""
         blob_name = f"clips/{clip_id}/audio.wav"
@@ -104,11 +350,10 @@ class VideoGenerationService:
             "content_type": "audio/wav"
         }
         
-        blob.upload_from_string(audio_data, content_type="audio/wav")
-        blob.make_public()
-        
+        await asyncio.to_thread(blob.upload_from_string, audio_data, content_type="audio/wav")
+        audio_url = self._blob_url(blob)
         logger.info(f"Audio uploaded: {blob.public_url}")
-        return blob.public_url
+        return audio_url
     
     async def _generate_video_with_did(
         self, 
@@ -116,7 +361,7 @@ class VideoGenerationService:
         audio_url: str,
         clip_id: str,
         presenter_image: Optional[str] = None
-    ) -> str:
+    ) -> Tuple[str, BinaryIO]:
         """
         Generate video using D-ID API
         
@@ -125,54 +370,64 @@ class VideoGenerationService:
             audio_url: Public URL of the audio file
             clip_id: Clip identifier
             presenter_image: Custom presenter image URL
+            
+        Returns:
+            Tuple of the GCS video URL and the downloaded video file, which
+            the caller must close
         """
         try:
             # Default presenter image if not provided
             if not presenter_image:
                 presenter_image = "https://create-images-results.d-id.com/default-presenter-image.jpg"
             
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                # Create talk video
-                create_payload = {
-                    "script": {
-                        "type": "audio",
-                        "audio_url": audio_url
-                    },
-                    "source_url": presenter_image,
-                    "config": {
-                        "fluent": True,
-                        "pad_audio": 0.0,
-                        "stitch": True
-                    }
+            client = await self._get_http()
+            
+            # Create talk video
+            create_payload = {
+                "script": {
+                    "type": "audio",
+                    "audio_url": audio_url
+                },
+                "source_url": presenter_image,
+                "config": {
+                    "fluent": True,
+                    "pad_audio": 0.0,
+                    "stitch": True
                 }
-                
-                logger.info(f"Creating D-ID talk for clip {clip_id}")
-                response = await client.post(
-                    f"{self.did_url}/talks",
-                    headers={
-                        "Authorization": f"Basic {self.did_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json=create_payload
-                )
-                response.raise_for_status()
-                talk_data = response.json()
-                talk_id = talk_data["id"]
-                
-                logger.info(f"D-ID talk created with ID: {talk_id}")
-                
-                # Poll for completion
-                video_url = await self._poll_did_video(client, talk_id)
-                
-                # Download and upload to GCS
-                final_url = await self._download_and_upload_video(
-                    client, 
-                    video_url, 
-                    clip_id
+            }
+            
+            # Ask for a completion webhook when reachable and authenticated
+            use_webhook = bool(settings.PUBLIC_API_BASE and settings.DID_WEBHOOK_SECRET)
+            if use_webhook:
+                create_payload["webhook"] = (
+                    f"{settings.PUBLIC_API_BASE.rstrip('/')}/webhooks/did/{clip_id}?"
+                    + urlencode({"token": settings.DID_WEBHOOK_SECRET})
                 )
-                
-                return final_url
-                
+            
+            logger.info(f"Creating D-ID talk for clip {clip_id}")
+            response = await client.post(
+                f"{self.did_url}/talks",
+                headers={
+                    "Authorization": f"Basic {self.did_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=create_payload
+            )
+            response.raise_for_status()
+            talk_data = response.json()
+            talk_id = talk_data["id"]
+            
+            logger.info(f"D-ID talk created with ID: {talk_id}")
+            
+            # Wait for completion
+            if use_webhook:
+                video_url = await self._wait_for_did(clip_id, talk_id)
+            else:
+                video_url = await self._poll_did_video(talk_id)
+            
+            # Download and upload to GCS
+            return await self._download_and_upload_video(video_url, clip_id)
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"D-ID API error: {e.response.status_code} - {e.response.text}")
             raise
@@ -180,199 +435,321 @@ class VideoGenerationService:
             logger.error(f"Error generating video with D-ID: {str(e)}", exc_info=True)
             raise
     
+    async def _wait_for_did(
+        self,
+        clip_id: str,
+        talk_id: str,
+        timeout: float = 600.0
+    ) -> str:
+        """
+        Wait for a D-ID talk using the webhook with a slow poll alongside
+        
+        The webhook may be delivered to another replica, so a long-interval
+        poll always runs too and whichever finishes first wins. A webhook
+        only triggers an immediate status check against the D-ID API.
+        
+        Args:
+            clip_id: Clip identifier the webhook is registered for
+            talk_id: D-ID talk ID
+            timeout: Total time budget for the talk (seconds)
+        """
+        webhook_signal = asyncio.get_running_loop().create_future()
+        _pending_did_talks[talk_id] = (clip_id, webhook_signal)
+        poll_task = asyncio.create_task(
+            self._poll_did_video(
+                talk_id,
+                timeout=timeout,
+                initial_interval=5.0,
+                max_interval=30.0
+            )
+        )
+        
+        try:
+            done, _ = await asyncio.wait(
+                {poll_task, webhook_signal},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if poll_task not in done:
+                try:
+                    video_url = await self._check_did_talk(talk_id)
+                    if video_url:
+                        return video_url
+                except httpx.HTTPStatusError as e:
+                    logger.error(f"Error confirming D-ID webhook: {e.response.status_code}")
+            
+            return await poll_task
+        finally:
+            poll_task.cancel()
+            _pending_did_talks.pop(talk_id, None)
+    
+    async def _check_did_talk(self, talk_id: str) -> Optional[str]:
+        """
+        Fetch the current state of a D-ID talk
+        
+        Returns:
+            Result video URL if the talk is done, None while still processing
+        """
+        client = await self._get_http()
+        response = await client.get(
+            f"{self.did_url}/talks/{talk_id}",
+            headers={"Authorization": f"Basic {self.did_api_key}"}
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        status = data.get("status")
+        logger.info(f"D-ID talk {talk_id} status: {status}")
+        
+        if status == "done":
+            return data["result_url"]
+        elif status == "error":
+            error_msg = data.get("error", {})
+            raise Exception(f"D-ID video generation failed: {error_msg}")
+        elif status not in ["created", "started"]:
+            logger.warning(f"Unknown D-ID status: {status}")
+        return None
+    
     async def _poll_did_video(
         self, 
-        client: httpx.AsyncClient, 
         talk_id: str,
-        max_attempts: int = 90,
-        poll_interval: int = 2
+        timeout: float = 600.0,
+        initial_interval: float = 1.0,
+        max_interval: float = 15.0,
+        backoff_factor: float = 1.6
     ) -> str:
         """
         Poll D-ID for video completion with exponential backoff
         
         Args:
-            client: HTTP client
             talk_id: D-ID talk ID
-            max_attempts: Maximum polling attempts
-            poll_interval: Initial interval between polls (seconds)
+            timeout: Total time budget for polling (seconds)
+            initial_interval: Initial interval between polls (seconds)
+            max_interval: Upper bound on the interval between polls (seconds)
+            backoff_factor: Multiplier applied to the interval after each poll
         """
-        for attempt in range(max_attempts):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = initial_interval
+        attempt = 0
+        
+        while True:
+            attempt += 1
             try:
-                response = await client.get(
-                    f"{self.did_url}/talks/{talk_id}",
-                    headers={"Authorization": f"Basic {self.did_api_key}"}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                status = data.get("status")
-                logger.info(f"D-ID talk {talk_id} status: {status} (attempt {attempt + 1}/{max_attempts})")
-                
-                if status == "done":
-                    return data["result_url"]
-                elif status == "error":
-                    error_msg = data.get("error", {})
-                    raise Exception(f"D-ID video generation failed: {error_msg}")
-                elif status in ["created", "started"]:
-                    # Still processing, wait and retry
-                    await asyncio.sleep(poll_interval)
-                else:
-                    logger.warning(f"Unknown D-ID status: {status}")
-                    await asyncio.sleep(poll_interval)
+                video_url = await self._check_did_talk(talk_id)
+                if video_url:
+                    return video_url
                     
             except httpx.HTTPStatusError as e:
-                logger.error(f"Error polling D-ID: {e.response.status_code}")
-                if attempt < max_attempts - 1:
-                    await asyncio.sleep(poll_interval)
-                else:
+                logger.error(f"Error polling D-ID: {e.response.status_code} (attempt {attempt})")
+                if loop.time() + delay >= deadline:
                     raise
+            
+            # Still processing, wait and retry
+            if loop.time() + delay >= deadline:
+                break
+            await asyncio.sleep(delay + random.uniform(0, 0.25 * delay))
+            delay = min(delay * backoff_factor, max_interval)
         
-        raise Exception(f"Video generation timed out after {max_attempts} attempts")
+        raise Exception(f"Video generation timed out after {timeout:.0f}s ({attempt} attempts)")
     
     async def _download_and_upload_video(
         self, 
-        client: httpx.AsyncClient, 
         video_url: str, 
         clip_id: str
-    ) -> str:
-        """Download video from D-ID and upload to Google Cloud Storage"""
-        logger.info(f"Downloading video from D-ID: {video_url}")
-        
-        # Download video
-        response = await client.get(video_url)
-        response.raise_for_status()
-        video_data = response.content
-        
-        logger.info(f"Video downloaded, size: {len(video_data)} bytes")
-        
-        # Upload to GCS
-        blob_name = f"clips/{clip_id}/video.mp4"
-        blob = self.video_bucket.blob(blob_name)
+    ) -> Tuple[str, BinaryIO]:
+        """
+        Download video from D-ID and upload to Google Cloud Storage
         
-        # Set metadata
-        blob.metadata = {
-            "clip_id": clip_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "source": "d-id"
-        }
+        The download is streamed into a spooled temporary file so large
+        videos never sit in memory as a single bytes object. The file is
+        returned rewound so later steps can reuse it without a second fetch;
+        the caller is responsible for closing it.
+        """
+        logger.info(f"Downloading video from D-ID: {video_url}")
         
-        blob.upload_from_string(video_data, content_type="video/mp4")
-        blob.make_public()
+        # Stream video into a spooled buffer (spills to disk above 8MB)
+        client = await self._get_http()
+        video_file = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        try:
+            async with client.stream("GET", video_url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(1024 * 1024):
+                    video_file.write(chunk)
+            
+            video_size = video_file.tell()
+            video_file.seek(0)
+            
+            logger.info(f"Video downloaded, size: {video_size} bytes")
+            
+            # Upload to GCS
+            blob_name = f"clips/{clip_id}/video.mp4"
+            blob = self.video_bucket.blob(blob_name, chunk_size=VIDEO_UPLOAD_CHUNK_SIZE)
+            
+            # Set metadata
+            blob.metadata = {
+                "clip_id": clip_id,
+                "created_at": datetime.utcnow().isoformat(),
+                "source": "d-id"
+            }
+            
+            await asyncio.to_thread(
+                blob.upload_from_file,
+                video_file,
+                size=video_size,
+                content_type="video/mp4"
+            )
+            video_file.seek(0)
+        except BaseException:
+            video_file.close()
+            raise
         
         logger.info(f"Video uploaded to GCS: {blob.public_url}")
-        return blob.public_url
+        return self._blob_url(blob), video_file
     
-    async def _generate_thumbnail(self, clip_id: str, video_url: str) -> str:
+    async def _generate_thumbnail(self, clip_id: str, video_file: BinaryIO) -> str:
         """
-        Generate thumbnail from video using ffmpeg
-        Falls back to placeholder if ffmpeg not available
+        Generate thumbnail from the downloaded video using PyAV
+        Falls back to placeholder if the frame cannot be decoded
         """
         try:
-            import subprocess
-            import tempfile
+            # Decode and encode off the event loop
+            thumbnail_data = await asyncio.to_thread(self._extract_thumbnail, video_file)
+            
+            # Upload thumbnail
+            blob_name = f"clips/{clip_id}/thumbnail.jpg"
+            blob = self.video_bucket.blob(blob_name)
+            await asyncio.to_thread(
+                blob.upload_from_string,
+                thumbnail_data,
+                content_type="image/jpeg"
+            )
+            
+            return self._blob_url(blob)
             
-            # Download video to temp file
-            async with httpx.AsyncClient() as client:
-                response = await client.get(video_url)
-                response.raise_for_status()
-                
-                with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as video_file:
-                    video_file.write(response.content)
-                    video_path = video_file.name
-                
-                with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as thumb_file:
-                    thumb_path = thumb_file.name
-                
-                # Generate thumbnail at 1 second mark
-                subprocess.run([
-                    'ffmpeg', '-i', video_path,
-                    '-ss', '00:00:01',
-                    '-vframes', '1',
-                    '-vf', 'scale=640:360',
-                    thumb_path
-                ], check=True, capture_output=True)
-                
-                # Upload thumbnail
-                with open(thumb_path, 'rb') as f:
-                    thumbnail_data = f.read()
-                
-                blob_name = f"clips/{clip_id}/thumbnail.jpg"
-                blob = self.video_bucket.blob(blob_name)
-                blob.upload_from_string(thumbnail_data, content_type="image/jpeg")
-                blob.make_public()
-                
-                # Cleanup
-                os.unlink(video_path)
-                os.unlink(thumb_path)
-                
-                return blob.public_url
-                
         except Exception as e:
             logger.warning(f"Could not generate thumbnail: {str(e)}, using placeholder")
             # Return placeholder thumbnail
-            return f"https://via.placeholder.com/640x360/007AFF/FFFFFF?text=Motivational+Clip"
+            return PLACEHOLDER_THUMBNAIL_URL
+    
+    @staticmethod
+    def _extract_thumbnail(
+        video_file: BinaryIO,
+        at_seconds: float = 1.0,
+        size: Tuple[int, int] = (640, 360)
+    ) -> bytes:
+        """
+        Decode a single frame and encode it as a JPEG, all in-process
+        
+        Args:
+            video_file: Seekable file-like object containing the MP4
+            at_seconds: Timestamp of the frame to capture
+            size: Output (width, height)
+            
+        Returns:
+            JPEG image bytes
+        """
+        with av.open(video_file) as container:
+            stream = container.streams.video[0]
+            container.seek(int(at_seconds / stream.time_base), stream=stream)
+            
+            # Seeking lands on the preceding keyframe; decode up to the mark,
+            # keeping the last frame for clips shorter than at_seconds
+            frame = None
+            for frame in container.decode(stream):
+                if frame.time is not None and frame.time >= at_seconds:
+                    break
+            
+            if frame is None:
+                raise ValueError("No video frames decoded")
+            
+            image = frame.to_image().resize(size)
+        
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=82)
+        return buffer.getvalue()
     
     async def _calculate_duration(self, audio_data: bytes) -> int:
         """
         Calculate audio/video duration in seconds
-        Uses wave library to read WAV file metadata
+        Reads the canonical 44-byte PCM WAV header produced by Riva
         """
-        try:
-            import wave
-            import io
-            
-            with wave.open(io.BytesIO(audio_data), 'rb') as wav_file:
-                frames = wav_file.getnframes()
-                rate = wav_file.getframerate()
-                duration = frames / float(rate)
-                return int(duration)
-        except Exception as e:
-            logger.warning(f"Could not calculate duration: {str(e)}, returning default")
-            return 60  # Default 60 seconds
+        if (
+            len(audio_data) >= 44
+            and audio_data[:4] == b"RIFF"
+            and audio_data[8:12] == b"WAVE"
+            and audio_data[36:40] == b"data"
+        ):
+            channels, rate = struct.unpack_from("<HI", audio_data, 22)
+            bits_per_sample, = struct.unpack_from("<H", audio_data, 34)
+            data_size, = struct.unpack_from("<I", audio_data, 40)
+            
+            bytes_per_second = rate * channels * bits_per_sample // 8
+            if bytes_per_second:
+                return int(data_size / bytes_per_second)
+        
+        logger.warning("Could not calculate duration from WAV header, returning default")
+        return 60  # Default 60 seconds
     
     async def batch_generate_clips(
         self, 
         clips_data: List[Dict],
-        job_id: str
+        job_id: str,
+        max_concurrency: int = 4
     ) -> List[Dict]:
         """
         Generate multiple clips in batch
         
+        Clips are generated concurrently, with at most max_concurrency
+        D-ID jobs in flight at once.
+        
         Args:
             clips_data: List of dicts with 'script', 'clip_id', 'voice_name'
             job_id: Processing job ID
+            max_concurrency: Maximum number of clips generated at once
             
         Returns:
-            List of generation results
+            List of generation results, in the same order as clips_data
         """
-        results = []
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        for i, clip_data in enumerate(clips_data):
-            try:
-                logger.info(f"Generating clip {i+1}/{len(clips_data)} for job {job_id}")
-                
-                result = await self.generate_video(
-                    script=clip_data['script'],
-                    clip_id=clip_data['clip_id'],
-                    voice_name=clip_data.get('voice_name'),
-                    presenter_image=clip_data.get('presenter_image')
-                )
-                
-                results.append({
-                    "success": True,
-                    "clip_id": clip_data['clip_id'],
-                    "result": result
-                })
-                
-            except Exception as e:
-                logger.error(f"Failed to generate clip {clip_data['clip_id']}: {str(e)}")
-                results.append({
-                    "success": False,
-                    "clip_id": clip_data['clip_id'],
-                    "error": str(e)
-                })
-        
-        return results
+        async def _generate_one(i: int, clip_data: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    logger.info(f"Generating clip {i+1}/{len(clips_data)} for job {job_id}")
+                    
+                    result = await self.generate_video(
+                        script=clip_data['script'],
+                        clip_id=clip_data['clip_id'],
+                        voice_name=clip_data.get('voice_name'),
+                        presenter_image=clip_data.get('presenter_image')
+                    )
+                    
+                    return {
+                        "success": True,
+                        "clip_id": clip_data['clip_id'],
+                        "result": result
+                    }
+                    
+                except Exception as e:
+                    logger.error(f"Failed to generate clip {clip_data['clip_id']}: {str(e)}")
+                    return {
+                        "success": False,
+                        "clip_id": clip_data['clip_id'],
+                        "error": str(e)
+                    }
+        
+        results = await asyncio.gather(
+            *[_generate_one(i, clip_data) for i, clip_data in enumerate(clips_data)]
+        )
+        
+        return list(results)
+    
+    def _video_topic_path(self) -> str:
+        """Pub/Sub topic for video generation tasks"""
+        return self.publisher.topic_path(
+            settings.GCP_PROJECT_ID,
+            settings.PUBSUB_TOPIC_VIDEO_PROCESSING
+        )
     
     async def publish_generation_task(self, clip_data: Dict) -> str:
         """
@@ -384,14 +761,71 @@ class VideoGenerationService:
         Returns:
             Message ID
         """
-        topic_path = self.publisher.topic_path(
-            settings.GCP_PROJECT_ID,
-            settings.PUBSUB_TOPIC_VIDEO_PROCESSING
-        )
-        
-        message_data = json.dumps(clip_data).encode('utf-8')
-        future = self.publisher.publish(topic_path, message_data)
-        message_id = future.result()
+        message_data = orjson.dumps(clip_data)
+        future = self.publisher.publish(self._video_topic_path(), message_data)
+        message_id = await asyncio.wrap_future(future)
         
         logger.info(f"Published video generation task: {message_id}")
         return message_id
+    
+    async def publish_many(self, clips_data: List[Dict]) -> List[str]:
+        """
+        Publish several video generation tasks at once
+        
+        Messages are queued together so the publisher can send them in
+        batched RPCs.
+        
+        Args:
+            clips_data: List of clip generation data
+            
+        Returns:
+            Message IDs, in the same order as clips_data
+        """
+        topic_path = self._video_topic_path()
+        futures = [
+            self.publisher.publish(topic_path, orjson.dumps(clip_data))
+            for clip_data in clips_data
+        ]
+        message_ids = await asyncio.gather(*[asyncio.wrap_future(f) for f in futures])
+        
+        logger.info(f"Published {len(message_ids)} video generation tasks")
+        return list(message_ids)
+
+
+# Process-wide service instance, created once at application startup
+_service_singleton: Optional[VideoGenerationService] = None
+
+
+def get_video_service() -> VideoGenerationService:
+    """
+    Dependency to get the shared video generation service
+    Usage: service: VideoGenerationService = Depends(get_video_service)
+    """
+    global _service_singleton
+    if _service_singleton is None:
+        _service_singleton = VideoGenerationService()
+    return _service_singleton
+
+
+@asynccontextmanager
+async def video_service_lifespan(app) -> AsyncIterator[None]:
+    """
+    Build and warm the shared service on startup, close it on shutdown
+    Usage: FastAPI(lifespan=video_service_lifespan), or
+    `async with video_service_lifespan(app):` inside an existing lifespan.
+    Yields nothing; access the service via get_video_service() or
+    app.state.video_service.
+    """
+    global _service_singleton
+    service = get_video_service()
+    
+    # Build the D-ID and Riva HTTP clients before the first request
+    await service._get_http()
+    service.riva_service._get_http()
+    app.state.video_service = service
+    
+    try:
+        yield
+    finally:
+        await service.aclose()
+        _service_singleton = None
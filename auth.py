@@ -1,7 +1,10 @@
 """
 Authentication API endpoints
 """
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -22,12 +25,21 @@ from app.models.schemas import (
 
 router = APIRouter()
 
+# Statements built once so SQLAlchemy reuses its compiled form on every request
+_STMT_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_STMT_USER_BY_ID = select(User).where(User.id == bindparam("id"))
+
+# Verified against when the email is unknown so login timing does not reveal it
+_DUMMY_HASH = get_password_hash("dummy-credential-for-timing")
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = db.execute(
+        _STMT_USER_BY_EMAIL, {"email": user_data.email}
+    ).scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -35,33 +47,35 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
     new_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
         hashed_password=hashed_password
     )
     
+    # Flush to get the primary key via INSERT ... RETURNING and build the
+    # response before commit expires the instance, avoiding a reload SELECT
     db.add(new_user)
+    db.flush()
+    response = UserResponse.model_validate(new_user, from_attributes=True)
     db.commit()
-    db.refresh(new_user)
     
-    return new_user
+    return response
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     """Login user and return JWT tokens"""
     # Find user
-    user = db.query(User).filter(User.email == credentials.email).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
+    user = db.execute(
+        _STMT_USER_BY_EMAIL, {"email": credentials.email}
+    ).scalar_one_or_none()
     
-    # Verify password
-    if not verify_password(credentials.password, user.hashed_password):
+    # Verify password (always run bcrypt, off the event loop)
+    target_hash = user.hashed_password if user else _DUMMY_HASH
+    password_ok = await asyncio.to_thread(verify_password, credentials.password, target_hash)
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -100,7 +114,7 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
             )
         
         user_id = payload.get("sub")
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.execute(_STMT_USER_BY_ID, {"id": user_id}).scalar_one_or_none()
         
         if not user or not user.is_active:
             raise HTTPException(
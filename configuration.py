@@ -1,6 +1,7 @@
 """
 Application configuration using Pydantic settings
 """
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from typing import List
 import os
@@ -30,6 +31,8 @@ class Settings(BaseSettings):
     GCP_REGION: str = "us-central1"
     GCS_BUCKET_NAME: str = "motivational-content-bucket"
     GCS_VIDEO_BUCKET: str = "motivational-videos-bucket"
+    GCS_VIDEO_BUCKET_PUBLIC: bool = True  # Public-read via IAM; otherwise serve signed URLs
+    GCS_SIGNED_URL_EXPIRATION_DAYS: int = Field(default=7, ge=1, le=7)  # V4 maximum is 7 days
     
     # Firestore
     FIRESTORE_COLLECTION_USERS: str = "users"
@@ -53,10 +56,16 @@ class Settings(BaseSettings):
     VIDEO_GENERATION_API: str = "d-id"  # Options: d-id, synthesia, custom
     DID_API_KEY: str = ""
     DID_API_URL: str = "https://api.d-id.com"
+    DID_WEBHOOK_SECRET: str = ""
+    
+    # Public base URL of this API, used for third-party webhooks
+    PUBLIC_API_BASE: str = ""
     
     # Storage
     UPLOAD_MAX_SIZE: int = 100 * 1024 * 1024  # 100MB
     VIDEO_MAX_DURATION: int = 120  # seconds
+    VIDEO_CACHE_ENABLED: bool = True
+    VIDEO_CACHE_PREFIX: str = "cache"  # Evicted by a bucket lifecycle rule
     
     # CORS
     CORS_ORIGINS: List[str] = [
@@ -0,0 +1,40 @@
+"""
+Webhook endpoints for third-party service callbacks
+"""
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.core.config import settings
+from app.services.video_service import resolve_did_webhook
+
+router = APIRouter()
+
+
+@router.post("/did/{clip_id}")
+async def did_webhook(clip_id: str, request: Request, token: Optional[str] = None):
+    """Receive D-ID talk completion callbacks"""
+    if not settings.DID_WEBHOOK_SECRET or not secrets.compare_digest(
+        (token or "").encode("utf-8"),
+        settings.DID_WEBHOOK_SECRET.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook token"
+        )
+    
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    
+    if not isinstance(data, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook payload must be a JSON object"
+        )
+    
+    resolved = resolve_did_webhook(clip_id, data)
+    
+    return {"received": True, "resolved": resolved}